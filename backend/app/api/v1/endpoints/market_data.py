@@ -1,37 +1,57 @@
 """Market data API endpoints."""
 
-from datetime import datetime, timedelta
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import orjson
+from cachetools import TTLCache
 from fastapi import APIRouter, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, Response
 
-from ....infrastructure.external.gridstatus_client import GridStatusService
+from ....domain.trading.value_objects import OrderSide, SimulationPhase
 from ....services.trading_simulation import trading_simulation
-from ..schemas import MarketDataSchema
+from ..schemas import MarketDataSchema, PriceSchema, QuantitySchema
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Short-lived cache for read-heavy chart endpoints; cleared whenever market data is (re)loaded
+_response_cache: TTLCache = TTLCache(maxsize=16, ttl=30)
+
+# PJM is the only supported market, so the /markets payload never changes
+_MARKETS_RESPONSE = {
+    "markets": ["PJM"],
+    "count": 1,
+    "description": "Available electricity markets for trading"
+}
 
 
 def convert_domain_to_response(market_data) -> MarketDataSchema:
-    """Convert domain MarketData to response schema."""
+    """Convert domain MarketData to response schema.
+
+    Domain objects are already validated, so the schemas are built with
+    ``model_construct`` to skip a second round of Pydantic validation.
+    """
     volume = None
     if market_data.volume is not None:
-        volume = {
-            "value": market_data.volume.value,
-            "unit": market_data.volume.unit
-        }
+        volume = QuantitySchema.model_construct(
+            value=market_data.volume.value,
+            unit=market_data.volume.unit
+        )
     
     load = None
     if market_data.load is not None:
-        load = {
-            "value": market_data.load.value,
-            "unit": market_data.load.unit
-        }
+        load = QuantitySchema.model_construct(
+            value=market_data.load.value,
+            unit=market_data.load.unit
+        )
     
-    return MarketDataSchema(
+    return MarketDataSchema.model_construct(
         id=str(market_data.id.value),
-        price={
-            "value": market_data.price.value,
-            "currency": market_data.price.currency
-        },
+        price=PriceSchema.model_construct(
+            value=market_data.price.value,
+            currency=market_data.price.currency
+        ),
         volume=volume,
         load=load,
         market_type=market_data.market_type,
@@ -40,20 +60,22 @@ def convert_domain_to_response(market_data) -> MarketDataSchema:
     )
 
 
-
-
-
 @router.get("/summary")
-async def get_market_summary() -> dict:
+async def get_market_summary():
     """Get market summary using D-1 simulation strategy."""
     
-    # Use D-1 simulation service
-    summary = trading_simulation.get_market_summary_d1()
-    
-    # Do not auto-initialize here to avoid repeated external API calls
-    # Frontend should explicitly call /initialize once
+    cache_key = ("summary", trading_simulation.phase)
+    summary = _response_cache.get(cache_key)
+    if summary is None:
+        # Use D-1 simulation service
+        summary = await run_in_threadpool(trading_simulation.get_market_summary_d1)
+        
+        # Do not auto-initialize here to avoid repeated external API calls
+        # Frontend should explicitly call /initialize once
+        if summary.get("status") != "no_data":
+            _response_cache[cache_key] = summary
     
-    return summary
+    return ORJSONResponse(content=summary)
 
 
 @router.post("/refresh")
@@ -63,10 +85,11 @@ async def refresh_simulation_data() -> dict:
     try:
         # Re-initialize the simulation with fresh D-1 data
         result = await trading_simulation.initialize_market_data()
+        _response_cache.clear()
         
         return {
             "message": "D-1 simulation data refreshed",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
             "initialization_result": result,
             "status": "success"
         }
@@ -74,7 +97,7 @@ async def refresh_simulation_data() -> dict:
     except Exception as e:
         return {
             "message": "Error refreshing simulation data",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
             "error": str(e),
             "status": "error"
         }
@@ -83,21 +106,15 @@ async def refresh_simulation_data() -> dict:
 @router.get("/markets")
 async def get_available_markets() -> dict:
     """Get list of available markets from GridStatus."""
-    
-    service = GridStatusService()
-    markets = await service.get_available_markets()
-    
-    return {
-        "markets": markets,
-        "count": len(markets),
-        "description": "Available electricity markets for trading"
-    }
+    return _MARKETS_RESPONSE
 
 
 @router.post("/initialize")
 async def initialize_simulation() -> dict:
     """Initialize the D-1 simulation with yesterday's market data."""
-    return await trading_simulation.initialize_market_data()
+    result = await trading_simulation.initialize_market_data()
+    _response_cache.clear()
+    return result
 
 
 @router.post("/bids")
@@ -105,61 +122,75 @@ async def place_bid(
     hour: int = Query(..., ge=0, le=23, description="Hour slot (0-23)"),
     price: float = Query(..., gt=0, description="Bid price in USD/MWh"),
     quantity: float = Query(..., gt=0, description="Quantity in MWh"),
-    side: str = Query(..., regex="^(BUY|SELL)$", description="Order side: BUY or SELL"),
+    side: OrderSide = Query(..., description="Order side: BUY or SELL"),
     user_id: str = Query("demo_user", description="User ID")
-) -> dict:
+):
     """Place a bid for a specific hour slot."""
-    return trading_simulation.place_bid(hour=hour, price=price, quantity=quantity, side=side, user_id=user_id)
+    result = await run_in_threadpool(
+        trading_simulation.place_bid, hour=hour, price=price, quantity=quantity, side=side.value, user_id=user_id
+    )
+    return ORJSONResponse(content=result)
 
 
 @router.get("/bids")
 async def get_user_bids(
     user_id: str = Query("demo_user", description="User ID")
-) -> dict:
+):
     """Get all bids for a user."""
-    bids = trading_simulation.get_all_bids(user_id=user_id)
-    return {
+    bids = await run_in_threadpool(trading_simulation.get_all_bids, user_id=user_id)
+    return ORJSONResponse(content={
         "bids": bids,
         "count": len(bids),
         "user_id": user_id
-    }
+    })
 
 
 @router.get("/trades")
 async def get_user_trades(
     user_id: str = Query("demo_user", description="User ID")
-) -> dict:
+):
     """Get all trades for a user with P&L calculations."""
-    trades = trading_simulation.get_all_trades(user_id=user_id)
-    total_pnl = sum(trade.get("pnl", 0) for trade in trades)
+    trades = await run_in_threadpool(trading_simulation.get_all_trades, user_id=user_id)
+    # fsum keeps the running total exact regardless of trade count/order
+    total_pnl = math.fsum(trade.get("pnl", 0.0) for trade in trades)
     
-    return {
+    return ORJSONResponse(content={
         "trades": trades,
         "count": len(trades),
         "total_pnl": total_pnl,
         "user_id": user_id,
-        "reference_date": trading_simulation.get_reference_date().strftime("%Y-%m-%d")
-    }
+        "reference_date": trading_simulation.get_reference_date_str()
+    })
 
 
 @router.get("/simulation/status")
-async def get_simulation_status() -> dict:
+async def get_simulation_status():
     """Get the current simulation status and reference date."""
-    status = trading_simulation.get_simulation_status()
-    return status
+    status = await run_in_threadpool(trading_simulation.get_simulation_status)
+    return ORJSONResponse(content=status)
 
 
 @router.get("/timeseries")
-async def get_timeseries() -> dict:
+async def get_timeseries():
     """Get D-1 day-ahead (hourly) and real-time (5-min) timeseries for charts."""
-    series = trading_simulation.get_timeseries()
-    return series
+    # The series only changes with the simulated day and minute
+    cache_key = ("timeseries", trading_simulation.get_reference_date_str(), trading_simulation.get_now().strftime("%H:%M"))
+    body = _response_cache.get(cache_key)
+    if body is None:
+        series = await run_in_threadpool(trading_simulation.get_timeseries)
+        # Encoded once per key; NumPy price columns go straight from their buffers
+        body = orjson.dumps(series, option=orjson.OPT_SERIALIZE_NUMPY)
+        if series.get("status") != "no_data":
+            # Stored under the day and minute the payload was built for, which an advance or
+            # reset racing this request may have moved away from the lookup key
+            _response_cache[("timeseries", series["reference_date"], series["current_simulation_time"])] = body
+    return Response(content=body, media_type="application/json")
 
 
 @router.post("/simulation/advance")
 async def advance_simulation() -> dict:
     """Advance to trading day (D0) and perform batch clearing."""
-    result = trading_simulation.advance_to_trading_day()
+    result = await run_in_threadpool(trading_simulation.advance_to_trading_day)
     return result
 
 
@@ -167,23 +198,24 @@ async def advance_simulation() -> dict:
 async def set_simulation_time(
     hour: int = Query(..., ge=0, le=23, description="Simulated UTC hour"),
     minute: int = Query(0, ge=0, le=59, description="Simulated UTC minute"),
-    phase: str = Query(None, regex="^(BIDDING|TRADING)$", description="Optional: Set phase (BIDDING=D-1, TRADING=D0)")
+    phase: Optional[SimulationPhase] = Query(None, description="Optional: Set phase (BIDDING=D-1, TRADING=D0)")
 ) -> dict:
     """Set simulated current UTC time and optionally change phase."""
+    # Every branch takes the order book lock; keep it off the event loop
     if phase:
-        if phase == "BIDDING":
-            result = trading_simulation.back_to_bidding_day()
-        elif phase == "TRADING":
-            result = trading_simulation.advance_to_trading_day()
+        if phase is SimulationPhase.BIDDING:
+            result = await run_in_threadpool(trading_simulation.back_to_bidding_day)
+        elif phase is SimulationPhase.TRADING:
+            result = await run_in_threadpool(trading_simulation.advance_to_trading_day)
         else:
-            result = trading_simulation.set_simulated_time(hour=hour, minute=minute)
+            result = await run_in_threadpool(trading_simulation.set_simulated_time, hour=hour, minute=minute)
     else:
-        result = trading_simulation.set_simulated_time(hour=hour, minute=minute)
+        result = await run_in_threadpool(trading_simulation.set_simulated_time, hour=hour, minute=minute)
     return result
 
 
 @router.post("/reset")
 async def reset_order_book() -> dict:
     """Clear all bids and trades from the order book."""
-    result = trading_simulation.reset_order_book()
+    result = await run_in_threadpool(trading_simulation.reset_order_book)
     return result
@@ -2,6 +2,7 @@
 
 import os
 from dotenv import load_dotenv
+from pydantic import PrivateAttr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional, List
 
@@ -23,13 +24,23 @@ class Settings(BaseSettings):
     
     # Market Data - PJM Focus
     primary_market: str = os.getenv("PRIMARY_MARKET", "PJM")  # Focus on PJM only
+    prefetch_market_data: bool = os.getenv("PREFETCH_MARKET_DATA", "true").lower() == "true"  # Warm cache on startup
+    
+    # Order book bounds - oldest bids (and their trades) are evicted past either limit
+    max_bids: int = int(os.getenv("MAX_BIDS", "10000"))
+    max_bid_age_days: int = int(os.getenv("MAX_BID_AGE_DAYS", "7"))
     
     # CORS - Use string type to avoid Pydantic JSON parsing
     cors_origins: str = "http://localhost:5173,http://localhost:3000,https://cvector.torportech.ai"
+    _cors_origins_list: List[str] = PrivateAttr(default_factory=list)
+    
+    def model_post_init(self, __context) -> None:
+        """Split the CORS origins string once when settings are loaded."""
+        self._cors_origins_list = [origin.strip() for origin in self.cors_origins.split(",")]
     
     def get_cors_origins(self) -> List[str]:
         """Get CORS origins as a list."""
-        return [origin.strip() for origin in self.cors_origins.split(",")]
+        return self._cors_origins_list
 
 
 settings = Settings()
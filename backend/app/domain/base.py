@@ -1,23 +1,23 @@
 """Base classes for domain entities and value objects."""
 
 from abc import ABC
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Dict
 from uuid import UUID, uuid4
 from pydantic import BaseModel, Field
 
 
-class ValueObject(BaseModel, ABC):
-    """Base class for value objects."""
-    
-    class Config:
-        frozen = True  # Immutable
+@dataclass(frozen=True, slots=True)
+class ValueObject(ABC):
+    """Base class for value objects (immutable, no per-instance __dict__)."""
 
 
+@dataclass(frozen=True, slots=True)
 class EntityId(ValueObject):
     """Base entity identifier."""
     
-    value: UUID = Field(default_factory=uuid4)
+    value: UUID = field(default_factory=uuid4)
     
     def __str__(self) -> str:
         return str(self.value)
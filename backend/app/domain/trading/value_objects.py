@@ -1,5 +1,6 @@
 """Trading domain value objects - simplified for D-1 simulation."""
 
+from dataclasses import dataclass
 from decimal import Decimal
 from enum import Enum
 
@@ -12,6 +13,19 @@ class MarketType(str, Enum):
     REAL_TIME = "REAL_TIME"
 
 
+class OrderSide(str, Enum):
+    """Order side enumeration."""
+    BUY = "BUY"
+    SELL = "SELL"
+
+
+class SimulationPhase(str, Enum):
+    """Simulation phase enumeration."""
+    BIDDING = "BIDDING"  # D-1
+    TRADING = "TRADING"  # D0
+
+
+@dataclass(frozen=True, slots=True)
 class Price(ValueObject):
     """Price value object."""
     
@@ -22,6 +36,7 @@ class Price(ValueObject):
         return f"{self.value:.2f} {self.currency}"
 
 
+@dataclass(frozen=True, slots=True)
 class Quantity(ValueObject):
     """Quantity value object."""
     
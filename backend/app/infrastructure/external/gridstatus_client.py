@@ -3,10 +3,12 @@
 import os
 import asyncio
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 from decimal import Decimal
+import numpy as np
 import pandas as pd
+from cachetools import TLRUCache
 
 try:
     import gridstatusio
@@ -19,14 +21,65 @@ import uuid
 
 logger = logging.getLogger(__name__)
 
+# Candidate column names across GridStatus datasets, in order of preference
+_PRICE_COLUMNS = ('lmp', 'price', 'marginal_cost', 'clearing_price')
+_LOAD_COLUMNS = ('load', 'demand', 'mw', 'total_load')
+_VOLUME_COLUMNS = ('mw', 'volume', 'quantity')
+_TIMESTAMP_COLUMNS = ('interval_start_utc', 'timestamp', 'datetime', 'interval_start', 'time')
+_PREFERRED_HUBS = ('WESTERN HUB', 'EASTERN HUB', 'NEW JERSEY HUB', 'AEP GEN HUB')
+_REAL_TIME_TTL_SECONDS = 60
+
+
+def _seconds_until_utc_midnight() -> float:
+    """Seconds left in the current UTC day."""
+    now = datetime.now(timezone.utc)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - now).total_seconds()
+
+
+def _lmp_series_expiry(key: tuple, value: list, now: float) -> float:
+    """Real-time series expire after a minute; day-ahead series hold until the next UTC midnight."""
+    market_type = key[1]
+    if market_type is MarketType.REAL_TIME:
+        return now + _REAL_TIME_TTL_SECONDS
+    return now + _seconds_until_utc_midnight()
+
+
+# Converted LMP series shared by every caller in the process, keyed by (market, market type, date)
+_lmp_series_cache: TLRUCache = TLRUCache(maxsize=16, ttu=_lmp_series_expiry)
+
+
+def _resolve_column(df: pd.DataFrame, candidates: tuple) -> Optional[str]:
+    """Return the first candidate column present in the DataFrame, if any."""
+    return next((col for col in candidates if col in df.columns), None)
+
+
+def _parse_utc_timestamps(values: pd.Series) -> pd.Series:
+    """Parse a timestamp column to tz-aware UTC in a single vectorized pass."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        # Already parsed by gridstatusio - only normalize the timezone
+        return values.dt.tz_localize("UTC") if values.dt.tz is None else values.dt.tz_convert("UTC")
+    # ISO strings: fixed format skips per-element inference, cache dedupes repeats
+    # errors="coerce" turns a malformed string into NaT so only that row is dropped
+    return pd.to_datetime(values, utc=True, format="ISO8601", errors="coerce", cache=True)
+
 
 @dataclass
 class MarketDataId:
     """Simple market data identifier."""
     value: str
     
-    def __init__(self):
-        self.value = str(uuid.uuid4())
+    def __init__(self, value: Optional[str] = None):
+        self.value = value if value is not None else str(uuid.uuid4())
+
+
+def _bulk_market_data_ids(count: int) -> List[MarketDataId]:
+    """Generate random (version 4) ids for a whole frame from one urandom read."""
+    buffer = os.urandom(16 * count)
+    return [
+        MarketDataId(str(uuid.UUID(bytes=buffer[offset:offset + 16], version=4)))
+        for offset in range(0, 16 * count, 16)
+    ]
 
 
 @dataclass
@@ -42,7 +95,7 @@ class MarketData:
     
     def __post_init__(self):
         if self.timestamp is None:
-            self.timestamp = datetime.utcnow()
+            self.timestamp = datetime.now(timezone.utc)
 
 
 class GridStatusService:
@@ -60,7 +113,7 @@ class GridStatusService:
                 self.client = gridstatusio.GridStatusClient()
                 logger.info("GridStatus client initialized successfully")
             except Exception as e:
-                logger.error(f"Failed to initialize GridStatus client: {e}")
+                logger.error("Failed to initialize GridStatus client: %s", e)
         else:
             logger.warning("GridStatus client not available - using mock data")
     
@@ -77,16 +130,21 @@ class GridStatusService:
         
         # Use yesterday as reference date (D-1 strategy)
         if reference_date is None:
-            reference_date = datetime.utcnow() - timedelta(days=1)
+            reference_date = datetime.now(timezone.utc) - timedelta(days=1)
         
         # Format dates for API call - try single day first to test data availability
         start_date = reference_date.strftime("%Y-%m-%d") + "T00:00:00Z"
         end_date = reference_date.strftime("%Y-%m-%d") + "T23:59:59Z"  # Full single day only
         
+        cache_key = (market, MarketType.REAL_TIME, start_date[:10])
+        cached = _lmp_series_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             # Focus on PJM only - use PJM Western Hub as single region
             dataset_name = "pjm_lmp_real_time_5_min"
-            logger.info(f"Fetching PJM real-time LMP data for {reference_date.strftime('%Y-%m-%d')} (no limit)")
+            logger.info("Fetching PJM real-time LMP data for %s (no limit)", start_date[:10])
             
             # Run in thread pool since gridstatusio is synchronous
             loop = asyncio.get_event_loop()
@@ -101,44 +159,24 @@ class GridStatusService:
                 )
             )
 
-            print(df)            
-            # Filter for single location to avoid duplicates
-            if not df.empty and 'location' in df.columns:
-                # Prefer WESTERN HUB, or fall back to first available hub
-                available_hubs = df['location'].unique()
-                preferred_hubs = ['WESTERN HUB', 'EASTERN HUB', 'NEW JERSEY HUB', 'AEP GEN HUB']
-                
-                selected_hub = None
-                for hub in preferred_hubs:
-                    if hub in available_hubs:
-                        selected_hub = hub
-                        break
-                
-                if selected_hub is None:
-                    selected_hub = available_hubs[0]
-                
-                df = df[df['location'] == selected_hub]
-                logger.info(f"Using PJM real-time location: {selected_hub} with {len(df)} records")
-                print(f"Available hubs: {list(available_hubs)}")
-                print(f"Selected hub: {selected_hub}")
-                
-                            # Debug: Check if we still have duplicates after location filtering
-            if len(df) > 0:
-                print(f"After location filtering - First 5 timestamps:")
-                print(df['interval_start_utc'].head().tolist())
-                print(f"Last 5 timestamps:")
-                print(df['interval_start_utc'].tail().tolist())
-                
-                # Check for duplicate timestamps
-                duplicates = df['interval_start_utc'].duplicated().sum()
-                print(f"Duplicate timestamps after location filter: {duplicates}")
-                print(f"API Query: start={start_date}, end={end_date}")
-                print(f"Total rows returned: {len(df)}")
+            df = self._select_single_hub(df, "real-time")
+            
+            # Only pay for the diagnostics when debug logging is on
+            if logger.isEnabledFor(logging.DEBUG) and len(df) > 0:
+                logger.debug(
+                    "Real-time query start=%s end=%s: %d rows, first=%s, last=%s",
+                    start_date, end_date, len(df),
+                    df['interval_start_utc'].head().tolist(),
+                    df['interval_start_utc'].tail().tolist()
+                )
             
-            return self._convert_lmp_dataframe_to_market_data(df, MarketType.REAL_TIME)
+            series = self._convert_lmp_dataframe_to_market_data(df, MarketType.REAL_TIME)
+            if series:
+                _lmp_series_cache[cache_key] = series
+            return series
             
         except Exception as e:
-            logger.error(f"Error fetching real-time PJM LMP data: {e}")
+            logger.error("Error fetching real-time PJM LMP data: %s", e)
             return []
     
     async def fetch_day_ahead_lmp_data(
@@ -154,15 +192,20 @@ class GridStatusService:
         
         # Use yesterday as reference date (D-1 strategy)
         if reference_date is None:
-            reference_date = datetime.utcnow() - timedelta(days=1)
+            reference_date = datetime.now(timezone.utc) - timedelta(days=1)
         
         # Format date for API call
         date_str = reference_date.strftime("%Y-%m-%d")
         
+        cache_key = (market, MarketType.DAY_AHEAD, date_str)
+        cached = _lmp_series_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             # Focus on PJM day-ahead data only
             dataset_name = "pjm_lmp_day_ahead_hourly"
-            logger.info(f"Fetching PJM day-ahead LMP data for {date_str} (no limit)")
+            logger.info("Fetching PJM day-ahead LMP data for %s (no limit)", date_str)
             
             loop = asyncio.get_event_loop()
             df = await loop.run_in_executor(
@@ -176,30 +219,15 @@ class GridStatusService:
                 )
             )
             
-            # Filter for single location to avoid duplicates
-            if not df.empty and 'location' in df.columns:
-                # Prefer WESTERN HUB, or fall back to first available hub
-                available_hubs = df['location'].unique()
-                preferred_hubs = ['WESTERN HUB', 'EASTERN HUB', 'NEW JERSEY HUB', 'AEP GEN HUB']
-                
-                selected_hub = None
-                for hub in preferred_hubs:
-                    if hub in available_hubs:
-                        selected_hub = hub
-                        break
-                
-                if selected_hub is None:
-                    selected_hub = available_hubs[0]
-                
-                df = df[df['location'] == selected_hub]
-                logger.info(f"Using PJM day-ahead location: {selected_hub} with {len(df)} records")
-                print(f"Available hubs: {list(available_hubs)}")
-                print(f"Selected hub: {selected_hub}")
+            df = self._select_single_hub(df, "day-ahead")
             
-            return self._convert_lmp_dataframe_to_market_data(df, MarketType.DAY_AHEAD)
+            series = self._convert_lmp_dataframe_to_market_data(df, MarketType.DAY_AHEAD)
+            if series:
+                _lmp_series_cache[cache_key] = series
+            return series
             
         except Exception as e:
-            logger.error(f"Error fetching day-ahead PJM LMP data: {e}")
+            logger.error("Error fetching day-ahead PJM LMP data: %s", e)
             return []
     
     async def fetch_load_data(
@@ -216,7 +244,7 @@ class GridStatusService:
         try:
             # Focus on PJM load data only
             dataset_name = "pjm_load"
-            logger.info(f"Fetching PJM load data (limit: {limit})")
+            logger.info("Fetching PJM load data (limit: %s)", limit)
             
             loop = asyncio.get_event_loop()
             df = await loop.run_in_executor(
@@ -227,9 +255,29 @@ class GridStatusService:
             return self._convert_load_dataframe_to_market_data(df)
             
         except Exception as e:
-            logger.error(f"Error fetching PJM load data: {e}")
+            logger.error("Error fetching PJM load data: %s", e)
             return []
     
+    def _select_single_hub(self, df: pd.DataFrame, label: str) -> pd.DataFrame:
+        """Keep one PJM hub and one row per interval, sorted by interval start."""
+        if df.empty or 'location' not in df.columns:
+            return df
+        
+        # Prefer WESTERN HUB, or fall back to first available hub
+        available_hubs = df['location'].unique()
+        available = set(available_hubs)
+        selected_hub = next((hub for hub in _PREFERRED_HUBS if hub in available), available_hubs[0])
+        
+        df = df[df['location'] == selected_hub]
+        if 'interval_start_utc' in df.columns:
+            df = (
+                df.sort_values('interval_start_utc', kind='stable')
+                .drop_duplicates('interval_start_utc', keep='first')
+                .reset_index(drop=True)
+            )
+        logger.info("Using PJM %s location: %s with %d records", label, selected_hub, len(df))
+        return df
+    
     def _convert_lmp_dataframe_to_market_data(
         self, 
         df: pd.DataFrame, 
@@ -237,104 +285,90 @@ class GridStatusService:
     ) -> List[MarketData]:
         """Convert LMP DataFrame to MarketData entities."""
         
-        market_data_list = []
+        # Resolve the price/timestamp/volume columns once for the whole frame
+        price_col = _resolve_column(df, _PRICE_COLUMNS)
+        if price_col is None:
+            return []
+        timestamp_col = _resolve_column(df, _TIMESTAMP_COLUMNS)
+        volume_col = _resolve_column(df, _VOLUME_COLUMNS)
         
-        for _, row in df.iterrows():
-            try:
-                # Extract price - LMP is typically in 'lmp' or 'price' column
-                price_value = None
-                for col in ['lmp', 'price', 'marginal_cost', 'clearing_price']:
-                    if col in row and pd.notna(row[col]):
-                        price_value = float(row[col])
-                        break
-                
-                if price_value is None:
-                    continue
-                
-                # Extract timestamp
-                timestamp = None
-                for col in ['interval_start_utc', 'timestamp', 'datetime', 'interval_start', 'time']:
-                    if col in row and pd.notna(row[col]):
-                        if isinstance(row[col], str):
-                            timestamp = datetime.fromisoformat(row[col].replace('Z', '+00:00'))
-                        else:
-                            timestamp = pd.to_datetime(row[col]).to_pydatetime()
-                        break
-                
-                if timestamp is None:
-                    timestamp = datetime.utcnow()
-                
-                # Extract volume if available
-                volume = None
-                for col in ['mw', 'volume', 'quantity']:
-                    if col in row and pd.notna(row[col]):
-                        volume = Quantity(value=Decimal(str(float(row[col]))), unit="MW")
-                        break
-                
-                market_data = MarketData(
-                    id=MarketDataId(),
-                    price=Price(value=Decimal(str(price_value)), currency="USD"),
-                    volume=volume,
-                    market_type=market_type,
-                    timestamp=timestamp,
-                    source="gridstatus"
-                )
-                
-                market_data_list.append(market_data)
-                
-            except Exception as e:
-                logger.warning(f"Error converting row to MarketData: {e}")
-                continue
+        # Pull whole columns out as arrays and drop rows without a price
+        prices = pd.to_numeric(df[price_col], errors="coerce").to_numpy(dtype="float64")
+        mask = ~np.isnan(prices)
+        if timestamp_col is not None:
+            timestamps = _parse_utc_timestamps(df[timestamp_col])
+            mask &= timestamps.notna().to_numpy()
+        # Row positions to keep, in time order: the simulation slices series by time prefix,
+        # and frames that skip _select_single_hub (no location column) arrive unsorted
+        rows = np.flatnonzero(mask)
+        if timestamp_col is not None:
+            index = pd.DatetimeIndex(timestamps.iloc[rows])
+            if not index.is_monotonic_increasing:
+                order = index.argsort(kind="stable")
+                rows = rows[order]
+                index = index[order]
+            timestamps = index.to_pydatetime()
+        else:
+            timestamps = [datetime.now(timezone.utc)] * len(rows)
+        
+        volumes: List[Optional[Quantity]] = [None] * len(timestamps)
+        if volume_col is not None:
+            raw_volumes = pd.to_numeric(df[volume_col], errors="coerce").to_numpy(dtype="float64")[rows]
+            volumes = [
+                None if np.isnan(v) else Quantity(value=Decimal(str(v)), unit="MW")
+                for v in raw_volumes.tolist()
+            ]
         
-        return market_data_list
+        prices = prices[rows].tolist()
+        return [
+            MarketData(
+                id=market_data_id,
+                price=Price(value=Decimal(str(price)), currency="USD"),
+                volume=volume,
+                market_type=market_type,
+                timestamp=timestamp,
+                source="gridstatus"
+            )
+            for market_data_id, price, timestamp, volume in zip(
+                _bulk_market_data_ids(len(prices)), prices, timestamps, volumes
+            )
+        ]
     
     def _convert_load_dataframe_to_market_data(self, df: pd.DataFrame) -> List[MarketData]:
         """Convert load DataFrame to MarketData entities."""
         
-        market_data_list = []
+        # Resolve the load/timestamp columns once for the whole frame
+        load_col = _resolve_column(df, _LOAD_COLUMNS)
+        if load_col is None:
+            return []
+        timestamp_col = _resolve_column(df, _TIMESTAMP_COLUMNS)
         
-        for _, row in df.iterrows():
-            try:
-                # Extract load value
-                load_value = None
-                for col in ['load', 'demand', 'mw', 'total_load']:
-                    if col in row and pd.notna(row[col]):
-                        load_value = float(row[col])
-                        break
-                
-                if load_value is None:
-                    continue
-                
-                # Extract timestamp
-                timestamp = None
-                for col in ['interval_start_utc', 'timestamp', 'datetime', 'interval_start', 'time']:
-                    if col in row and pd.notna(row[col]):
-                        if isinstance(row[col], str):
-                            timestamp = datetime.fromisoformat(row[col].replace('Z', '+00:00'))
-                        else:
-                            timestamp = pd.to_datetime(row[col]).to_pydatetime()
-                        break
-                
-                if timestamp is None:
-                    timestamp = datetime.utcnow()
-                
-                # Use a nominal price for load data (we'll get actual prices from LMP)
-                market_data = MarketData(
-                    id=MarketDataId(),
-                    price=Price(value=Decimal("0.00"), currency="USD"),  # Load data doesn't have price
-                    load=Quantity(value=Decimal(str(load_value)), unit="MW"),
-                    market_type=MarketType.REAL_TIME,
-                    timestamp=timestamp,
-                    source="gridstatus"
-                )
-                
-                market_data_list.append(market_data)
-                
-            except Exception as e:
-                logger.warning(f"Error converting load row to MarketData: {e}")
-                continue
+        loads = pd.to_numeric(df[load_col], errors="coerce").to_numpy(dtype="float64")
+        mask = ~np.isnan(loads)
+        if timestamp_col is not None:
+            timestamps = _parse_utc_timestamps(df[timestamp_col])
+            mask &= timestamps.notna().to_numpy()
+            timestamps = pd.DatetimeIndex(timestamps[mask]).to_pydatetime()
+        else:
+            timestamps = [datetime.now(timezone.utc)] * int(mask.sum())
+        
+        # Use a nominal price for load data (we'll get actual prices from LMP)
+        nominal_price = Price(value=Decimal("0.00"), currency="USD")
         
-        return market_data_list
+        loads = loads[mask].tolist()
+        return [
+            MarketData(
+                id=market_data_id,
+                price=nominal_price,  # Load data doesn't have price
+                load=Quantity(value=Decimal(str(load)), unit="MW"),
+                market_type=MarketType.REAL_TIME,
+                timestamp=timestamp,
+                source="gridstatus"
+            )
+            for market_data_id, load, timestamp in zip(
+                _bulk_market_data_ids(len(loads)), loads, timestamps
+            )
+        ]
     
 
     
@@ -343,3 +377,7 @@ class GridStatusService:
         
         # Focus on PJM only for this implementation
         return ["PJM"]
+
+
+# Shared service instance so the GridStatus client is initialized once per process
+gridstatus_service = GridStatusService()
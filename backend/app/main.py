@@ -1,17 +1,36 @@
 """Main FastAPI application."""
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from .config import settings
 from .api.v1.endpoints import market_data
+from .services.trading_simulation import trading_simulation
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the market data cache in the background so the first request doesn't pay for it."""
+    prefetch = None
+    if settings.prefetch_market_data:
+        # Fill the cache only; the simulated clock starts on the first /initialize
+        prefetch = asyncio.create_task(trading_simulation.initialize_market_data(anchor_clock=False))
+    yield
+    if prefetch is not None and not prefetch.done():
+        prefetch.cancel()
 
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_name,
     version=settings.version,
-    debug=settings.debug
+    debug=settings.debug,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware
@@ -1,115 +1,412 @@
 """Trading simulation service using D-1 (yesterday) data strategy."""
 
 from typing import List, Dict, Optional
-from datetime import datetime, timezone
-import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import asyncio
+import itertools
+import logging
+import threading
+import time
 
-from ..infrastructure.external.gridstatus_client import GridStatusService
+import numpy as np
 
-# In-memory storage for bids and trades (for demo purposes)
-_bids: Dict[str, Dict] = {}
-_trades: Dict[str, Dict] = {}
+from ..config import settings
+from ..infrastructure.external.gridstatus_client import gridstatus_service
+
+logger = logging.getLogger(__name__)
+
+# Fixed simulation dates: D-1 (bidding) = September 2, D0 (delivery) = September 3, 2025
+_BIDDING_DATE = datetime(2025, 9, 2, tzinfo=timezone.utc)
+_DELIVERY_DATE = datetime(2025, 9, 3, tzinfo=timezone.utc)
+# Formatted once at import - these strings are returned on almost every request
+_BIDDING_DATE_STR = _BIDDING_DATE.strftime("%Y-%m-%d")
+_DELIVERY_DATE_STR = _DELIVERY_DATE.strftime("%Y-%m-%d")
+# Bids for D0 close at 11:00 UTC on D-1
+_BIDDING_CUTOFF = _BIDDING_DATE.replace(hour=11)
+
+# Status polls within the same quarter second share one payload
+_STATUS_TICKS_PER_SECOND = 4
+
+
+# Monotonic in-process ids; exposed as strings at the API boundary
+_next_bid_id = itertools.count(1).__next__
+_next_trade_id = itertools.count(1).__next__
+
+_ORDER_SIDES = frozenset(("BUY", "SELL"))
+
+# Order book bounds: oldest bids (and their trades) are evicted first
+_MAX_BIDS = settings.max_bids
+_MAX_BID_AGE = timedelta(days=settings.max_bid_age_days)
 
 
 class Bid:
     """Simple bid representation."""
     
-    def __init__(self, hour: int, price: float, quantity: float, side: str = "BUY", user_id: str = "demo_user"):
-        self.id = str(uuid.uuid4())
+    __slots__ = ("id", "hour", "price", "quantity", "side", "user_id", "timestamp", "status", "clearing_price")
+    
+    def __init__(
+        self,
+        hour: int,
+        price: float,
+        quantity: float,
+        side: str = "BUY",
+        user_id: str = "demo_user",
+        timestamp: Optional[datetime] = None,
+    ):
+        self.id = _next_bid_id()
         self.hour = hour  # 0-23
         self.price = price  # USD/MWh
         self.quantity = quantity  # MWh
         self.side = side  # BUY or SELL
         self.user_id = user_id
-        self.timestamp = datetime.utcnow()
+        self.timestamp = timestamp or datetime.now(timezone.utc)
         self.status = "PENDING"  # PENDING, EXECUTED, REJECTED
+        self.clearing_price: Optional[float] = None  # Set when cleared on D0
+    
+    def to_dict(self) -> Dict:
+        """Serialize the bid for API responses."""
+        return {
+            "id": str(self.id),
+            "hour": self.hour,
+            "price": self.price,
+            "quantity": self.quantity,
+            "side": self.side,
+            "user_id": self.user_id,
+            "timestamp": self.timestamp.isoformat(),
+            "status": self.status,
+            "clearing_price": self.clearing_price,
+        }
 
 
 class Trade:
     """Simple trade representation."""
     
-    def __init__(self, bid_id: str, executed_price: float, quantity: float, hour: int):
-        self.id = str(uuid.uuid4())
+    __slots__ = ("id", "bid_id", "executed_price", "quantity", "hour", "timestamp")
+    
+    def __init__(
+        self,
+        bid_id: int,
+        executed_price: float,
+        quantity: float,
+        hour: int,
+        timestamp: Optional[datetime] = None,
+    ):
+        self.id = _next_trade_id()
         self.bid_id = bid_id
         self.executed_price = executed_price  # Day-ahead clearing price
         self.quantity = quantity
         self.hour = hour
-        self.timestamp = datetime.utcnow()
+        self.timestamp = timestamp or datetime.now(timezone.utc)
+    
+    def to_dict(self) -> Dict:
+        """Serialize the trade for API responses."""
+        return {
+            "id": str(self.id),
+            "bid_id": str(self.bid_id),
+            "executed_price": self.executed_price,
+            "quantity": self.quantity,
+            "hour": self.hour,
+            "timestamp": self.timestamp.isoformat(),
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class HourlyStats:
+    """Real-time price aggregates for one delivery hour."""
+    count: int
+    mean: float
+
+
+@dataclass(frozen=True, slots=True)
+class PriceColumns:
+    """Price series stored as parallel arrays (one entry per cached point)."""
+    timestamps: List[str]  # ISO strings, formatted once at ingestion
+    prices: np.ndarray  # float64 USD/MWh
+    minutes: np.ndarray  # uint16 minute of day (hour * 60 + minute), one packed compare key
+
+    @classmethod
+    def from_cache(cls, cache: Optional[List]) -> "PriceColumns":
+        """Unpack a list of MarketData into columns in a single pass."""
+        cache = cache or []
+        return cls(
+            timestamps=[md.timestamp.isoformat() for md in cache],
+            prices=np.fromiter((float(md.price.value) for md in cache), dtype=np.float64, count=len(cache)),
+            minutes=np.fromiter(
+                (md.timestamp.hour * 60 + md.timestamp.minute for md in cache), dtype=np.uint16, count=len(cache)
+            ),
+        )
 
 
 class TradingSimulationService:
     """Service for D-1 trading simulation."""
     
     def __init__(self):
-        self.gridstatus_service = GridStatusService()
+        self.gridstatus_service = gridstatus_service
+        # In-memory order book (for demo purposes). Endpoints call into the service from the
+        # threadpool, so mutations go through _lock.
+        self._lock = threading.Lock()
+        self._bids: Dict[int, Bid] = {}
+        self._trades: Dict[int, Trade] = {}
+        # Secondary indexes over the order book (kept in insertion order)
+        # Per-user ids are ordered sets (dict keys), so eviction pops in O(1)
+        self._bids_by_user: Dict[str, Dict[int, None]] = defaultdict(dict)  # user_id -> bid ids
+        self._trades_by_user: Dict[str, Dict[int, None]] = defaultdict(dict)  # user_id -> trade ids
+        self._trade_by_bid: Dict[int, int] = {}  # bid id -> trade id
+        self._pending_bids: Dict[int, None] = {}  # ordered set of PENDING bid ids
+        self._bid_status_counts: Dict[str, int] = defaultdict(int)  # status -> number of bids
+        self._order_book_version = 0  # bumped on every order book change
+        self._latest_bid_hour: Optional[int] = None  # max delivery hour over all bids
+        self._bids_per_hour: List[int] = [0] * 24  # delivery hour -> number of bids, for _latest_bid_hour
         # Separate caches for D-1 and D0 data
         self._d1_day_ahead_cache: Optional[List] = None  # D-1 (September 2) data
         self._d1_real_time_cache: Optional[List] = None
         self._d0_day_ahead_cache: Optional[List] = None  # D0 (September 3) data
         self._d0_real_time_cache: Optional[List] = None
         self._cache_date: Optional[datetime] = None
+        self._init_lock = asyncio.Lock()  # serializes market data fetches
+        self._market_data_version = 0  # bumped whenever the caches are rebuilt
+        # Hour-indexed views of the caches, rebuilt whenever the caches are fetched
+        self._d1_da_columns = PriceColumns.from_cache(None)
+        self._d0_da_columns = PriceColumns.from_cache(None)
+        self._d1_da_by_hour: Dict[int, float] = {}  # hour -> DA clearing price
+        self._d0_da_by_hour: Dict[int, float] = {}
+        self._d1_da_price_lut = self._build_price_lut({})  # same prices as a 24-entry array
+        self._d0_da_price_lut = self._build_price_lut({})
+        self._d1_rt_columns = PriceColumns.from_cache(None)
+        self._d0_rt_columns = PriceColumns.from_cache(None)
+        self._d1_rt_stats_by_hour: Dict[int, HourlyStats] = {}  # hour -> RT aggregates
+        self._d0_rt_stats_by_hour: Dict[int, HourlyStats] = {}
+        self._d1_market_summary: Optional[Dict] = None  # latest-price summary per day
+        self._d0_market_summary: Optional[Dict] = None
+        # Memoized (pnl, real_time_avg_price) per trade, valid for one RT cache
+        self._pnl_cache: Dict[int, tuple] = {}
+        self._pnl_cache_source: Optional[List] = None
+        # Last status payload and the state it was built from, reused within one status tick
+        self._status_cache: Optional[tuple] = None
         # Simulation controls
-        self.phase: str = "BIDDING"  # BIDDING (D-1) | TRADING (D0)
+        self._phase_is_trading = False  # BIDDING (D-1) until advanced to TRADING (D0)
         self._sim_now: Optional[datetime] = None  # Current simulated time clock head
-        self._sim_anchor_utc: Optional[datetime] = None  # Real UTC when sim clock was set
+        self._sim_anchor_mono: Optional[float] = None  # time.monotonic() when sim clock was set
+        self._cutoff_mono: Optional[float] = None  # time.monotonic() at 11:00 on the sim day
         self._sim_anchor_sim: Optional[datetime] = None  # Simulated time at anchor
     
+    @property
+    def phase(self) -> str:
+        """Current simulation phase: BIDDING (D-1) or TRADING (D0)."""
+        return "TRADING" if self._phase_is_trading else "BIDDING"
+    
+    @phase.setter
+    def phase(self, value: str) -> None:
+        self._phase_is_trading = value == "TRADING"
+    
     @property
     def _day_ahead_cache(self):
         """Get the appropriate day-ahead cache based on current phase."""
-        return self._d0_day_ahead_cache if self.phase == "TRADING" else self._d1_day_ahead_cache
+        return self._d0_day_ahead_cache if self._phase_is_trading else self._d1_day_ahead_cache
     
     @property 
     def _real_time_cache(self):
         """Get the appropriate real-time cache based on current phase."""
-        return self._d0_real_time_cache if self.phase == "TRADING" else self._d1_real_time_cache
+        return self._d0_real_time_cache if self._phase_is_trading else self._d1_real_time_cache
+    
+    @property
+    def _da_columns(self) -> PriceColumns:
+        """Get the columnar day-ahead series for the current phase."""
+        return self._d0_da_columns if self._phase_is_trading else self._d1_da_columns
+    
+    @property
+    def _da_by_hour(self) -> Dict[int, float]:
+        """Get the day-ahead clearing price per hour for the current phase."""
+        return self._d0_da_by_hour if self._phase_is_trading else self._d1_da_by_hour
+    
+    @property
+    def _da_price_lut(self) -> np.ndarray:
+        """Get the hour-indexed day-ahead price array for the current phase."""
+        return self._d0_da_price_lut if self._phase_is_trading else self._d1_da_price_lut
+    
+    @property
+    def _rt_columns(self) -> PriceColumns:
+        """Get the columnar real-time series for the current phase."""
+        return self._d0_rt_columns if self._phase_is_trading else self._d1_rt_columns
+    
+    @property
+    def _rt_stats_by_hour(self) -> Dict[int, HourlyStats]:
+        """Get the real-time aggregates per hour for the current phase."""
+        return self._d0_rt_stats_by_hour if self._phase_is_trading else self._d1_rt_stats_by_hour
+    
+    @staticmethod
+    def _index_day_ahead(columns: PriceColumns) -> Dict[int, float]:
+        """Map each hour to its day-ahead clearing price (first point wins)."""
+        by_hour: Dict[int, float] = {}
+        for minute, price in zip(columns.minutes.tolist(), columns.prices.tolist()):
+            by_hour.setdefault(minute // 60, price)
+        return by_hour
+    
+    @staticmethod
+    def _build_price_lut(by_hour: Dict[int, float]) -> np.ndarray:
+        """Lay an hour -> price map out as a 24-entry array; NaN marks hours without a price."""
+        lut = np.full(24, np.nan)
+        lut[list(by_hour)] = list(by_hour.values())
+        return lut
+    
+    @staticmethod
+    def _aggregate_real_time(columns: PriceColumns) -> Dict[int, HourlyStats]:
+        """Build every per-hour RT aggregate in one set of array reductions."""
+        hours = columns.minutes // 60
+        counts = np.bincount(hours, minlength=24)
+        sums = np.bincount(hours, weights=columns.prices, minlength=24)
+        present = np.flatnonzero(counts)
+        return {
+            hour: HourlyStats(count=count, mean=total / count)
+            for hour, count, total in zip(
+                present.tolist(),
+                counts[present].tolist(),
+                sums[present].tolist(),
+            )
+        }
+    
+    @staticmethod
+    def _build_market_summary(
+        day_ahead_cache: Optional[List],
+        real_time_cache: Optional[List],
+        da_columns: PriceColumns,
+        rt_columns: PriceColumns,
+        reference_date_str: str,
+    ) -> Optional[Dict]:
+        """Assemble the latest-price summary for one day (None if either cache is empty)."""
+        if not day_ahead_cache or not real_time_cache:
+            return None
+        day_ahead_price = float(da_columns.prices[-1])
+        real_time_price = float(rt_columns.prices[-1])
+        return {
+            "day_ahead": {
+                "price": day_ahead_price,
+                "currency": "USD",
+                "timestamp": day_ahead_cache[-1].timestamp,
+                "data_points": len(day_ahead_cache)
+            },
+            "real_time": {
+                "price": real_time_price,
+                "currency": "USD",
+                "timestamp": real_time_cache[-1].timestamp,
+                "data_points": len(real_time_cache)
+            },
+            "spread": real_time_price - day_ahead_price,
+            "reference_date": reference_date_str,
+            "simulation_mode": True
+        }
+    
+    def _rebuild_hour_indexes(self) -> None:
+        """Rebuild the derived columns, hour lookups and summaries after the D-1/D0 caches change."""
+        self._market_data_version += 1
+        self._d1_da_columns = PriceColumns.from_cache(self._d1_day_ahead_cache)
+        self._d0_da_columns = PriceColumns.from_cache(self._d0_day_ahead_cache)
+        self._d1_da_by_hour = self._index_day_ahead(self._d1_da_columns)
+        self._d0_da_by_hour = self._index_day_ahead(self._d0_da_columns)
+        self._d1_da_price_lut = self._build_price_lut(self._d1_da_by_hour)
+        self._d0_da_price_lut = self._build_price_lut(self._d0_da_by_hour)
+        self._d1_rt_columns = PriceColumns.from_cache(self._d1_real_time_cache)
+        self._d0_rt_columns = PriceColumns.from_cache(self._d0_real_time_cache)
+        self._d1_rt_stats_by_hour = self._aggregate_real_time(self._d1_rt_columns)
+        self._d0_rt_stats_by_hour = self._aggregate_real_time(self._d0_rt_columns)
+        self._d1_market_summary = self._build_market_summary(
+            self._d1_day_ahead_cache, self._d1_real_time_cache,
+            self._d1_da_columns, self._d1_rt_columns, _BIDDING_DATE_STR,
+        )
+        self._d0_market_summary = self._build_market_summary(
+            self._d0_day_ahead_cache, self._d0_real_time_cache,
+            self._d0_da_columns, self._d0_rt_columns, _DELIVERY_DATE_STR,
+        )
     
     def get_reference_date(self) -> datetime:
         """Get reference date for data fetches based on phase.
         - BIDDING (D-1): use September 2, 2025 for charts
         - TRADING (D0): use September 3, 2025 for DA/RT data
         """
-        if self.phase == "TRADING":
+        if self._phase_is_trading:
             # D0 = September 3, 2025
-            return datetime(2025, 9, 3, tzinfo=timezone.utc)
+            return _DELIVERY_DATE
         # BIDDING: D-1 = September 2, 2025 
-        return datetime(2025, 9, 2, tzinfo=timezone.utc)
+        return _BIDDING_DATE
+
+    def get_reference_date_str(self) -> str:
+        """Get the phase reference date formatted as YYYY-MM-DD."""
+        return _DELIVERY_DATE_STR if self._phase_is_trading else _BIDDING_DATE_STR
 
-    def get_now(self) -> datetime:
-        """Get current UTC time or simulated override."""
+    def get_now(self, real_now: Optional[datetime] = None) -> datetime:
+        """Get current UTC time or simulated override.
+
+        Callers that already read the wall clock can pass it as ``real_now``.
+        """
         if self._sim_now is None:
-            return datetime.now(timezone.utc)
-        # If we have anchors, progress simulated time relative to real elapsed time
-        if self._sim_anchor_utc and self._sim_anchor_sim:
-            delta = datetime.now(timezone.utc) - self._sim_anchor_utc
-            return self._sim_anchor_sim + delta
+            return real_now or datetime.now(timezone.utc)
+        # If we have anchors, progress simulated time by the monotonic time elapsed since,
+        # so wall clock adjustments (NTP steps) never move the simulation
+        if self._sim_anchor_mono is not None and self._sim_anchor_sim:
+            return self._sim_anchor_sim + timedelta(seconds=time.monotonic() - self._sim_anchor_mono)
         return self._sim_now
 
+    def _anchor_sim_clock(self, sim_time: datetime) -> None:
+        """Restart the simulated clock at ``sim_time`` and precompute when 11:00 is reached. Caller holds _lock."""
+        anchor_mono = time.monotonic()
+        cutoff = sim_time.replace(hour=11, minute=0, second=0, microsecond=0)
+        self._sim_now = sim_time
+        self._sim_anchor_sim = sim_time
+        self._sim_anchor_mono = anchor_mono
+        self._cutoff_mono = anchor_mono + (cutoff - sim_time).total_seconds()
+
+    def _before_cutoff(self, real_now: Optional[datetime] = None) -> bool:
+        """Whether the 11:00 UTC bidding cutoff is still ahead on the current (simulated) day."""
+        cutoff_mono = self._cutoff_mono
+        if cutoff_mono is None:
+            # No simulated clock yet: fall back to the wall-clock hour
+            return (real_now or datetime.now(timezone.utc)).hour < 11
+        return time.monotonic() < cutoff_mono
+
     def set_simulated_time(self, hour: int, minute: int = 0) -> Dict:
         """Set simulated current UTC time (maintains correct simulation date)."""
         # Clamp values
         hour = max(0, min(23, int(hour)))
         minute = max(0, min(59, int(minute)))
         
-        # Use correct simulation date based on phase
-        if self.phase == "BIDDING":
-            # D-1 = September 2, 2025
-            new_sim = datetime(2025, 9, 2, hour, minute, 0, 0, tzinfo=timezone.utc)
-        else:
-            # D0 = September 3, 2025
-            new_sim = datetime(2025, 9, 3, hour, minute, 0, 0, tzinfo=timezone.utc)
+        with self._lock:
+            # Use correct simulation date based on phase
+            if not self._phase_is_trading:
+                # D-1 = September 2, 2025
+                new_sim = datetime(2025, 9, 2, hour, minute, 0, 0, tzinfo=timezone.utc)
+            else:
+                # D0 = September 3, 2025
+                new_sim = datetime(2025, 9, 3, hour, minute, 0, 0, tzinfo=timezone.utc)
             
-        self._sim_now = new_sim
-        self._sim_anchor_sim = new_sim
-        self._sim_anchor_utc = datetime.now(timezone.utc)
+            self._anchor_sim_clock(new_sim)
         return {
             "status": "ok",
             "simulated_time": new_sim.isoformat(),
         }
     
-    async def initialize_market_data(self) -> Dict:
-        """Initialize market data for the reference date (D-1)."""
+    async def initialize_market_data(self, anchor_clock: bool = True) -> Dict:
+        """Initialize market data for the reference date (D-1).
+
+        The startup prefetch and /initialize may overlap; the lock makes later callers wait for
+        the in-flight fetch and then return the cached result instead of fetching again.
+        The startup prefetch passes ``anchor_clock=False`` so the simulated clock only starts
+        once a visitor initializes, not when the server boots.
+        """
+        async with self._init_lock:
+            result = await self._initialize_market_data()
+        if anchor_clock and result["status"] != "error":
+            # Default simulated time: 10:00 on September 2, 2025 (D-1) for UX
+            with self._lock:
+                if not self._phase_is_trading and self._sim_now is None:
+                    self._anchor_sim_clock(datetime(2025, 9, 2, 10, 0, 0, 0, tzinfo=timezone.utc))
+        return result
+    
+    async def _initialize_market_data(self) -> Dict:
+        """Fetch and cache D-1 and D0 market data unless already cached."""
         reference_date = self.get_reference_date()
+        reference_date_str = self.get_reference_date_str()
         
         # Check if we already have cached D-1 data
         if (self._cache_date and 
@@ -118,52 +415,48 @@ class TradingSimulationService:
             self._d1_real_time_cache):
             return {
                 "status": "cached",
-                "reference_date": reference_date.strftime("%Y-%m-%d"),
+                "reference_date": reference_date_str,
                 "day_ahead_points": len(self._d1_day_ahead_cache),
                 "real_time_points": len(self._d1_real_time_cache)
             }
         
         try:
             # Fetch BOTH D-1 and D0 data upfront to avoid async issues later
-            d1_date = datetime(2025, 9, 2, tzinfo=timezone.utc)  # D-1 = September 2
-            d0_date = datetime(2025, 9, 3, tzinfo=timezone.utc)  # D0 = September 3
+            d1_date = _BIDDING_DATE  # D-1 = September 2
+            d0_date = _DELIVERY_DATE  # D0 = September 3
             
-            print(f"DEBUG: Fetching D-1 data for {d1_date}")
-            self._d1_day_ahead_cache = await self.gridstatus_service.fetch_day_ahead_lmp_data(
-                market="PJM", reference_date=d1_date
+            # The four fetches are independent - run them concurrently on the shared client
+            logger.debug("Fetching D-1 data for %s and D0 data for %s", d1_date, d0_date)
+            (
+                self._d1_day_ahead_cache,
+                self._d1_real_time_cache,
+                self._d0_day_ahead_cache,
+                self._d0_real_time_cache,
+            ) = await asyncio.gather(
+                self.gridstatus_service.fetch_day_ahead_lmp_data(market="PJM", reference_date=d1_date),
+                self.gridstatus_service.fetch_realtime_lmp_data(market="PJM", reference_date=d1_date),
+                self.gridstatus_service.fetch_day_ahead_lmp_data(market="PJM", reference_date=d0_date),
+                self.gridstatus_service.fetch_realtime_lmp_data(market="PJM", reference_date=d0_date),
             )
-            self._d1_real_time_cache = await self.gridstatus_service.fetch_realtime_lmp_data(
-                market="PJM", reference_date=d1_date
-            )
-            print(f"DEBUG: Fetched D-1 data: {len(self._d1_day_ahead_cache)} DA, {len(self._d1_real_time_cache)} RT")
-            
-            print(f"DEBUG: Fetching D0 data for {d0_date}")
-            self._d0_day_ahead_cache = await self.gridstatus_service.fetch_day_ahead_lmp_data(
-                market="PJM", reference_date=d0_date
-            )
-            self._d0_real_time_cache = await self.gridstatus_service.fetch_realtime_lmp_data(
-                market="PJM", reference_date=d0_date
-            )
-            print(f"DEBUG: Fetched D0 data: {len(self._d0_day_ahead_cache)} DA, {len(self._d0_real_time_cache)} RT")
-            
-            # Debug: Check the time range of D-1 real-time data
-            if self._d1_real_time_cache:
-                first_rt = self._d1_real_time_cache[0].timestamp
-                last_rt = self._d1_real_time_cache[-1].timestamp
-                print(f"DEBUG: D-1 real-time data range: {first_rt} to {last_rt} ({len(self._d1_real_time_cache)} points)")
+            self._rebuild_hour_indexes()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Fetched D-1 data: %d DA, %d RT; D0 data: %d DA, %d RT",
+                    len(self._d1_day_ahead_cache), len(self._d1_real_time_cache),
+                    len(self._d0_day_ahead_cache), len(self._d0_real_time_cache),
+                )
+                # Check the time range of D-1 real-time data
+                if self._d1_real_time_cache:
+                    logger.debug(
+                        "D-1 real-time data range: %s to %s",
+                        self._d1_real_time_cache[0].timestamp, self._d1_real_time_cache[-1].timestamp,
+                    )
             
             self._cache_date = d1_date  # Use D-1 date as cache reference
-            print(f"DEBUG: Both D-1 and D0 data cached successfully")
-            
-            # Default simulated time: 10:00 on September 2, 2025 (D-1) for UX
-            if self.phase == "BIDDING" and self._sim_now is None:
-                self._sim_now = datetime(2025, 9, 2, 10, 0, 0, 0, tzinfo=timezone.utc)
-                self._sim_anchor_sim = self._sim_now
-                self._sim_anchor_utc = datetime.now(timezone.utc)
             
             return {
                 "status": "initialized",
-                "reference_date": reference_date.strftime("%Y-%m-%d"),
+                "reference_date": reference_date_str,
                 "day_ahead_points": len(self._d1_day_ahead_cache),
                 "real_time_points": len(self._d1_real_time_cache)
             }
@@ -172,172 +465,201 @@ class TradingSimulationService:
             return {
                 "status": "error",
                 "message": str(e),
-                "reference_date": reference_date.strftime("%Y-%m-%d")
+                "reference_date": reference_date_str
             }
     
     def place_bid(self, hour: int, price: float, quantity: float, side: str = "BUY", user_id: str = "demo_user") -> Dict:
         """Place a bid for a specific hour."""
+        # One wall-clock read serves both the cutoff check and the bid timestamp
+        real_now = datetime.now(timezone.utc)
         # Enforce phase and cutoff (11:00 UTC) during BIDDING
-        now = self.get_now()
-        if self.phase != "BIDDING":
+        if self._phase_is_trading:
             return {"status": "error", "message": "Bids are closed. Current phase is TRADING (D0)."}
-        if now.hour >= 11:
+        if not self._before_cutoff(real_now):
             return {"status": "error", "message": "Bidding cutoff passed (11:00 UTC)."}
         
-        if not 0 <= hour <= 23:
-            return {"status": "error", "message": "Hour must be between 0 and 23"}
-        
-        if price <= 0 or quantity <= 0:
-            return {"status": "error", "message": "Price and quantity must be positive"}
-        
-        if side not in ["BUY", "SELL"]:
+        # Valid bids pass a single combined check; only a failure works out which field is wrong
+        if not (0 <= hour < 24 and price > 0 and quantity > 0 and side in _ORDER_SIDES):
+            if not 0 <= hour < 24:
+                return {"status": "error", "message": "Hour must be between 0 and 23"}
+            if price <= 0 or quantity <= 0:
+                return {"status": "error", "message": "Price and quantity must be positive"}
             return {"status": "error", "message": "Side must be BUY or SELL"}
         
-        bid = Bid(hour=hour, price=price, quantity=quantity, side=side, user_id=user_id)
-        _bids[bid.id] = {
-            "id": bid.id,
-            "hour": bid.hour,
-            "price": bid.price,
-            "quantity": bid.quantity,
-            "side": bid.side,
-            "user_id": bid.user_id,
-            "timestamp": bid.timestamp.isoformat(),
-            "status": "PENDING",  # Always PENDING on D-1
-            "clearing_price": None  # Will be set when executed on D0
-        }
-        
-        print(f"DEBUG: Placed {side} bid for hour {hour} at ${price}/MWh - Status: PENDING (awaiting D0 clearing)")
+        # Always PENDING on D-1; the clearing price is set when executed on D0
+        bid = Bid(hour=hour, price=price, quantity=quantity, side=side, user_id=user_id, timestamp=real_now)
+        with self._lock:
+            # Re-checked under the lock: advance_to_trading_day may have cleared the book meanwhile
+            if self._phase_is_trading:
+                return {"status": "error", "message": "Bids are closed. Current phase is TRADING (D0)."}
+            self._evict_stale_bids(real_now)
+            self._bids[bid.id] = bid
+            self._bids_by_user[bid.user_id][bid.id] = None
+            self._bids_per_hour[bid.hour] += 1
+            self._pending_bids[bid.id] = None
+            self._bid_status_counts[bid.status] += 1
+            self._order_book_version += 1
+            if self._latest_bid_hour is None or bid.hour > self._latest_bid_hour:
+                self._latest_bid_hour = bid.hour
         
         return {
             "status": "success",
-            "bid_id": bid.id,
+            "bid_id": str(bid.id),
             "message": f"Bid placed for D0 hour {hour}:00. Status: PENDING until DAM clearing."
         }
     
-    def execute_bid(self, bid_id: str, ignore_time: bool = False) -> Dict:
+    def execute_bid(self, bid_id: int, ignore_time: bool = False) -> Dict:
         """Execute a bid using D-1 day-ahead clearing prices."""
-        
-        if bid_id not in _bids:
-            return {"status": "error", "message": "Bid not found"}
-        
-        bid_data = _bids[bid_id]
-        
-        # Check if it's time to execute (current UTC hour >= bid hour) unless forced during advance
-        if not ignore_time:
-            current_hour = self.get_now().hour
-            print(f"DEBUG: Current UTC hour: {current_hour}, Bid hour: {bid_data['hour']}")
-            if current_hour < bid_data["hour"]:
-                return {"status": "pending", "message": f"Waiting for hour {bid_data['hour']}. Current hour: {current_hour}"}
-        
-        if not self._day_ahead_cache:
-            return {"status": "error", "message": "No day-ahead data available"}
-        
-        # Find the day-ahead clearing price for the bid hour
-        clearing_price = None
-        for market_data in self._day_ahead_cache:
-            # Extract hour from timestamp
-            data_hour = market_data.timestamp.hour
-            if data_hour == bid_data["hour"]:
-                clearing_price = float(market_data.price.value)
-                break
-        
-        if clearing_price is None:
-            return {"status": "error", "message": f"No clearing price found for hour {bid_data['hour']}"}
-        
-        # Store clearing price in bid record
-        _bids[bid_id]["clearing_price"] = clearing_price
-        
-        # Execute based on BUY vs SELL logic
-        side = bid_data.get("side", "BUY")  # Default to BUY for backward compatibility
-        should_execute = False
-        
-        if side == "BUY":
-            # BUY: Execute if willing to pay >= clearing price
-            should_execute = bid_data["price"] >= clearing_price
-            print(f"DEBUG: BUY order - bid price {bid_data['price']} >= clearing price {clearing_price}: {should_execute}")
-        elif side == "SELL":
-            # SELL: Execute if willing to accept <= clearing price (market pays more than ask)
-            should_execute = bid_data["price"] <= clearing_price
-            print(f"DEBUG: SELL order - bid price {bid_data['price']} <= clearing price {clearing_price}: {should_execute}")
-        
-        if should_execute:
-            # Create trade
-            trade = Trade(
-                bid_id=bid_id,
-                executed_price=clearing_price,
-                quantity=bid_data["quantity"],
-                hour=bid_data["hour"]
-            )
+        real_now = datetime.now(timezone.utc)
+        
+        # Lookup, checks and settlement share one lock section: eviction can't remove the bid
+        # midway, and a second call can't settle the same bid twice
+        with self._lock:
+            bid = self._bids.get(bid_id)
+            if bid is None:
+                return {"status": "error", "message": "Bid not found"}
+            if bid.status != "PENDING":
+                return {"status": "error", "message": f"Bid already {bid.status}"}
             
-            _trades[trade.id] = {
-                "id": trade.id,
-                "bid_id": trade.bid_id,
-                "executed_price": trade.executed_price,
-                "quantity": trade.quantity,
-                "hour": trade.hour,
-                "timestamp": trade.timestamp.isoformat()
-            }
+            # Check if it's time to execute (current UTC hour >= bid hour) unless forced during advance
+            if not ignore_time:
+                current_hour = self.get_now(real_now).hour
+                if current_hour < bid.hour:
+                    return {"status": "pending", "message": f"Waiting for hour {bid.hour}. Current hour: {current_hour}"}
+            
+            if not self._day_ahead_cache:
+                return {"status": "error", "message": "No day-ahead data available"}
+            
+            # Find the day-ahead clearing price for the bid hour
+            clearing_price = self._da_by_hour.get(bid.hour)
             
-            # Update bid status
-            _bids[bid_id]["status"] = "EXECUTED"
-            print(f"DEBUG: Order EXECUTED - Bid: ${bid_data['price']}, Clearing: ${clearing_price}")
+            if clearing_price is None:
+                return {"status": "error", "message": f"No clearing price found for hour {bid.hour}"}
             
+            # Execute based on BUY vs SELL logic
+            side = bid.side
+            should_execute = False
+            
+            if side == "BUY":
+                # BUY: Execute if willing to pay >= clearing price
+                should_execute = bid.price >= clearing_price
+            elif side == "SELL":
+                # SELL: Execute if willing to accept <= clearing price (market pays more than ask)
+                should_execute = bid.price <= clearing_price
+            
+            # Store clearing price and outcome in bid record
+            bid.clearing_price = clearing_price
+            self._set_bid_status(bid, "EXECUTED" if should_execute else "REJECTED")
+            trade = self._record_trade(bid, clearing_price, real_now) if should_execute else None
+        logger.debug("Order %s - Bid: $%s, Clearing: $%s", bid.status, bid.price, clearing_price)
+        
+        if trade is not None:
             return {
                 "status": "executed",
-                "trade_id": trade.id,
+                "trade_id": str(trade.id),
                 "executed_price": clearing_price,
-                "bid_price": bid_data["price"],
-                "quantity": bid_data["quantity"]
+                "bid_price": bid.price,
+                "quantity": bid.quantity
             }
         else:
             # Bid rejected
-            _bids[bid_id]["status"] = "REJECTED"
-            print(f"DEBUG: Order REJECTED - Bid: ${bid_data['price']}, Clearing: ${clearing_price}")
-            
             return {
                 "status": "rejected",
                 "clearing_price": clearing_price,
-                "bid_price": bid_data["price"],
+                "bid_price": bid.price,
                 "reason": "Bid price below clearing price"
             }
     
-    def calculate_pnl(self, trade_id: str) -> Dict:
+    def _record_trade(self, bid: Bid, clearing_price: float, timestamp: datetime) -> Trade:
+        """Create and store the trade for an executed bid."""
+        trade = Trade(
+            bid_id=bid.id,
+            executed_price=clearing_price,
+            quantity=bid.quantity,
+            hour=bid.hour,
+            timestamp=timestamp
+        )
+        self._trades[trade.id] = trade
+        self._trades_by_user[bid.user_id][trade.id] = None
+        self._trade_by_bid[bid.id] = trade.id
+        return trade
+    
+    def _set_bid_status(self, bid: Bid, status: str) -> None:
+        """Move a bid to a settled status, keeping the status indexes in step. Caller holds _lock."""
+        self._bid_status_counts[bid.status] -= 1
+        self._bid_status_counts[status] += 1
+        bid.status = status
+        self._pending_bids.pop(bid.id, None)
+        self._order_book_version += 1
+    
+    def _evict_stale_bids(self, real_now: datetime) -> None:
+        """Drop bids older than _MAX_BID_AGE, then the oldest ones until there is room for one more.
+        
+        _bids is insertion-ordered, so the oldest bid is always first. Caller holds _lock.
+        """
+        cutoff = real_now - _MAX_BID_AGE
+        while self._bids:
+            oldest = next(iter(self._bids.values()))
+            if len(self._bids) < _MAX_BIDS and oldest.timestamp >= cutoff:
+                break
+            self._evict_bid(oldest)
+    
+    def _evict_bid(self, bid: Bid) -> None:
+        """Remove a bid, its trade and every index entry pointing at them. Caller holds _lock."""
+        del self._bids[bid.id]
+        self._pending_bids.pop(bid.id, None)
+        self._bid_status_counts[bid.status] -= 1
+        self._order_book_version += 1
+        user_bids = self._bids_by_user[bid.user_id]
+        del user_bids[bid.id]
+        
+        trade_id = self._trade_by_bid.pop(bid.id, None)
+        if trade_id is not None:
+            del self._trades[trade_id]
+            del self._trades_by_user[bid.user_id][trade_id]
+            self._pnl_cache.pop(trade_id, None)
+        
+        if not user_bids:
+            del self._bids_by_user[bid.user_id]
+            self._trades_by_user.pop(bid.user_id, None)
+        self._bids_per_hour[bid.hour] -= 1
+        if bid.hour == self._latest_bid_hour:
+            # Step down to the next hour that still has bids (at most 24 slots)
+            latest = bid.hour
+            while latest >= 0 and not self._bids_per_hour[latest]:
+                latest -= 1
+            self._latest_bid_hour = latest if latest >= 0 else None
+    
+    def calculate_pnl(self, trade_id: int) -> Dict:
         """Calculate P&L for a trade using real-time vs day-ahead prices."""
         
-        if trade_id not in _trades:
+        if trade_id not in self._trades:
             return {"status": "error", "message": "Trade not found"}
         
-        trade_data = _trades[trade_id]
+        trade = self._trades[trade_id]
         
         # Get the original bid to determine side (BUY/SELL)
-        bid_id = trade_data["bid_id"]
-        if bid_id not in _bids:
+        bid = self._bids.get(trade.bid_id)
+        if bid is None:
             return {"status": "error", "message": "Original bid not found"}
-        
-        bid_data = _bids[bid_id]
-        side = bid_data.get("side", "BUY")  # Default to BUY for backward compatibility
+        side = bid.side
         
         if not self._real_time_cache:
             return {"status": "error", "message": "No real-time data available"}
         
         # Find real-time prices for the trade hour
-        hour = trade_data["hour"]
-        real_time_prices = []
+        hour = trade.hour
+        stats = self._rt_stats_by_hour.get(hour)
         
-        for market_data in self._real_time_cache:
-            data_hour = market_data.timestamp.hour
-            if data_hour == hour:
-                real_time_prices.append(float(market_data.price.value))
-        
-        if not real_time_prices:
+        if stats is None:
             return {"status": "error", "message": f"No real-time prices found for hour {hour}"}
         
-        # Calculate average real-time price for the hour
-        avg_real_time_price = sum(real_time_prices) / len(real_time_prices)
+        # Average real-time price for the hour (precomputed at initialization)
+        avg_real_time_price = stats.mean
         
         # Calculate P&L based on BUY vs SELL
-        day_ahead_price = trade_data["executed_price"]
-        quantity = trade_data["quantity"]
+        day_ahead_price = trade.executed_price
+        quantity = trade.quantity
         
         if side == "BUY":
             # BUY: Profit when real-time > day-ahead (bought cheap, market went up)
@@ -351,77 +673,75 @@ class TradingSimulationService:
         
         return {
             "status": "success",
-            "trade_id": trade_id,
+            "trade_id": str(trade_id),
             "side": side,
             "day_ahead_price": day_ahead_price,
             "real_time_avg_price": avg_real_time_price,
             "quantity": quantity,
             "pnl": pnl,
-            "real_time_data_points": len(real_time_prices)
+            "real_time_data_points": stats.count
         }
     
     def get_all_bids(self, user_id: str = "demo_user") -> List[Dict]:
         """Get all bids for a user."""
         # On D-1: All bids should remain PENDING until user advances to D0
         # On D0: Show the results of clearing that happened during advance
-        return [bid for bid in _bids.values() if bid["user_id"] == user_id]
+        with self._lock:
+            return [self._bids[bid_id].to_dict() for bid_id in self._bids_by_user.get(user_id, ())]
     
     
     def get_all_trades(self, user_id: str = "demo_user") -> List[Dict]:
         """Get all trades for a user with P&L."""
-        # Trades only exist after advancing to D0 and clearing happens
-        user_bids = {bid["id"] for bid in _bids.values() if bid["user_id"] == user_id}
-        trades = [trade for trade in _trades.values() if trade["bid_id"] in user_bids]
-        
-        # Add P&L to each trade
-        for trade in trades:
-            pnl_result = self.calculate_pnl(trade["id"])
-            if pnl_result["status"] == "success":
-                trade["pnl"] = pnl_result["pnl"]
-                trade["real_time_avg_price"] = pnl_result["real_time_avg_price"]
-            else:
-                trade["pnl"] = 0.0
-                trade["real_time_avg_price"] = trade["executed_price"]
-        
-        return trades
+        # Trades only exist after advancing to D0 and clearing happens. Each P&L is an O(1)
+        # lookup, so the whole pass runs under the lock and never sees a half-evicted trade.
+        with self._lock:
+            trades = [self._trades[trade_id] for trade_id in self._trades_by_user.get(user_id, ())]
+            
+            # P&L only depends on the RT cache in use, so reuse results until it changes
+            if self._pnl_cache_source is not self._real_time_cache:
+                self._pnl_cache.clear()
+                self._pnl_cache_source = self._real_time_cache
+            
+            # Add P&L to each trade
+            result = []
+            for trade in trades:
+                cached = self._pnl_cache.get(trade.id)
+                if cached is None:
+                    pnl_result = self.calculate_pnl(trade.id)
+                    if pnl_result["status"] == "success":
+                        cached = (pnl_result["pnl"], pnl_result["real_time_avg_price"])
+                    else:
+                        cached = (0.0, trade.executed_price)
+                    self._pnl_cache[trade.id] = cached
+                trade_dict = trade.to_dict()
+                trade_dict["pnl"], trade_dict["real_time_avg_price"] = cached
+                result.append(trade_dict)
+        
+        return result
     
     def get_market_summary_d1(self) -> Dict:
         """Get market summary using D-1 data strategy."""
         
-        if not self._day_ahead_cache or not self._real_time_cache:
+        # Assembled once per fetch in _rebuild_hour_indexes
+        summary = self._d0_market_summary if self._phase_is_trading else self._d1_market_summary
+        if summary is None:  # either cache is empty
             return {
                 "status": "no_data",
                 "message": "Market data not initialized. Call /initialize first."
             }
         
-        # Get latest prices from cached data
-        latest_day_ahead = self._day_ahead_cache[-1] if self._day_ahead_cache else None
-        latest_real_time = self._real_time_cache[-1] if self._real_time_cache else None
-        
-        day_ahead_price = float(latest_day_ahead.price.value) if latest_day_ahead else 45.00
-        real_time_price = float(latest_real_time.price.value) if latest_real_time else 52.00
-        
-        return {
-            "day_ahead": {
-                "price": day_ahead_price,
-                "currency": "USD",
-                "timestamp": latest_day_ahead.timestamp if latest_day_ahead else datetime.utcnow(),
-                "data_points": len(self._day_ahead_cache)
-            },
-            "real_time": {
-                "price": real_time_price,
-                "currency": "USD",
-                "timestamp": latest_real_time.timestamp if latest_real_time else datetime.utcnow(),
-                "data_points": len(self._real_time_cache)
-            },
-            "spread": real_time_price - day_ahead_price,
-            "reference_date": self.get_reference_date().strftime("%Y-%m-%d"),
-            "simulation_mode": True
-        }
+        return summary
 
     def get_timeseries(self) -> Dict:
-        """Return D-1 day-ahead (hourly) and real-time (5-min) timeseries for charts."""
-        if not self._day_ahead_cache or not self._real_time_cache:
+        """Return D-1 day-ahead (hourly) and real-time (5-min) timeseries for charts.
+
+        Each series is columnar: ``{"timestamps": [iso, ...], "prices": ndarray}``.
+        """
+        # Read the phase once so the series, reference date and clock all describe the same day
+        trading = self._phase_is_trading
+        da_columns = self._d0_da_columns if trading else self._d1_da_columns
+        rt_columns = self._d0_rt_columns if trading else self._d1_rt_columns
+        if not da_columns.timestamps or not rt_columns.timestamps:
             return {
                 "status": "no_data",
                 "message": "Market data not initialized. Call /initialize first.",
@@ -431,181 +751,190 @@ class TradingSimulationService:
         current_utc = self.get_now()
         current_hour = current_utc.hour
         current_minute = current_utc.minute
-        cache_date = self._cache_date.strftime("%Y-%m-%d") if self._cache_date else "unknown"
-        print(f"DEBUG: Current UTC time: {current_utc}, filtering RT data up to {current_hour:02d}:{current_minute:02d}")
-        print(f"DEBUG: Cache date: {cache_date}, Phase: {self.phase}")
         
         # Day-ahead: show all 24 hours (this is known in advance)
-        day_ahead_series = [
-            {
-                "timestamp": md.timestamp.isoformat(),
-                "price": float(md.price.value),
-            }
-            for md in self._day_ahead_cache
-        ]
+        # Series are columnar (ISO strings and prices prebuilt at ingestion) so nothing is formatted per request
+        day_ahead_timestamps = da_columns.timestamps
+        day_ahead_prices = da_columns.prices
 
         # Real-time: only show data up to current time to simulate progression
         # Since we're using D-1 data, we need to show progression as if D-1 data is "today"
         
-        real_time_series = []
-        for md in self._real_time_cache:
-            # Get the time components from the D-1 data
-            data_hour = md.timestamp.hour
-            data_minute = md.timestamp.minute
-            
-            # Calculate total minutes since start of day for both data and current time
-            data_minutes_since_start = data_hour * 60 + data_minute
-            current_minutes_since_start = current_hour * 60 + current_minute
-            
-            # Show data if D-1 time point <= current time (simulating progression)
-            if data_minutes_since_start <= current_minutes_since_start:
-                real_time_series.append({
-                    "timestamp": md.timestamp.isoformat(),
-                    "price": float(md.price.value),
-                })
-            
-        print(f"DEBUG: Current time {current_hour:02d}:{current_minute:02d}, showing {len(real_time_series)} RT points out of {len(self._real_time_cache)} total")
-
-        # Debug: Show first few timestamps to verify dates
-        if day_ahead_series:
-            print(f"DEBUG: First few DA timestamps: {[p['timestamp'][:10] for p in day_ahead_series[:3]]}")
-        if real_time_series:
-            print(f"DEBUG: First few RT timestamps: {[p['timestamp'][:10] for p in real_time_series[:3]]}")
+        # Show data if the point's minute of day <= current time (simulating progression).
+        # The cache is sorted by interval start, so the visible points are a prefix.
+        visible = int(np.searchsorted(rt_columns.minutes, current_hour * 60 + current_minute, side="right"))
+        real_time_timestamps = rt_columns.timestamps[:visible]
+        real_time_prices = rt_columns.prices[:visible]
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Current time %02d:%02d (phase %s, cache date %s), showing %d RT points out of %d total",
+                current_hour, current_minute, "TRADING" if trading else "BIDDING", self._cache_date,
+                visible, len(rt_columns.timestamps),
+            )
 
         return {
-            "reference_date": self.get_reference_date().strftime("%Y-%m-%d"),
-            "day_ahead": day_ahead_series,
-            "real_time": real_time_series,
+            "reference_date": _DELIVERY_DATE_STR if trading else _BIDDING_DATE_STR,
+            "day_ahead": {"timestamps": day_ahead_timestamps, "prices": day_ahead_prices},
+            "real_time": {"timestamps": real_time_timestamps, "prices": real_time_prices},
             "simulation_mode": True,
             "current_simulation_time": f"{current_hour:02d}:{current_minute:02d}",
         }
 
     def get_simulation_status(self) -> Dict:
         """Return enriched simulation status for frontend UX."""
+        # One lock section, so the payload (and its cache key) never mixes two phases or clocks
+        with self._lock:
+            return self._build_simulation_status()
+
+    def _build_simulation_status(self) -> Dict:
+        """Build (or reuse) the status payload. Caller holds _lock."""
         # Ensure a default simulated time exists (10:00 on appropriate simulation date)
         if self._sim_now is None:
-            if self.phase == "BIDDING":
+            if not self._phase_is_trading:
                 target = datetime(2025, 9, 2, 10, 0, 0, 0, tzinfo=timezone.utc)
             else:
                 target = datetime(2025, 9, 3, 10, 0, 0, 0, tzinfo=timezone.utc)
-            self._sim_now = target
-            self._sim_anchor_sim = target
-            self._sim_anchor_utc = datetime.now(timezone.utc)
+            self._anchor_sim_clock(target)
+        # Everything the payload depends on; a cached payload is reused while this is unchanged
+        key = (
+            self._phase_is_trading, self._sim_anchor_mono, self._order_book_version, self._market_data_version,
+            int(time.monotonic() * _STATUS_TICKS_PER_SECOND),
+        )
+        cached = self._status_cache
+        if cached is not None and cached[0] == key:
+            return cached[1]
         now = self.get_now()
-        # Compute cutoff for 11:00 on the current simulation day
-        cutoff_dt = datetime(year=now.year, month=now.month, day=now.day, hour=11, minute=0, second=0, tzinfo=timezone.utc)
-        seconds_to_cutoff = int((cutoff_dt - now).total_seconds()) if self.phase == "BIDDING" else 0
+        # Countdown only runs during BIDDING, against the fixed D-1 cutoff
+        seconds_to_cutoff = 0 if self._phase_is_trading else int((_BIDDING_CUTOFF - now).total_seconds())
         # Fixed simulation dates
-        bidding_date = datetime(2025, 9, 2, tzinfo=timezone.utc)
-        delivery_date = datetime(2025, 9, 3, tzinfo=timezone.utc)
-        return {
+        status = {
             "simulation_mode": True,
             "phase": self.phase,
-            "bidding_date": bidding_date.strftime("%Y-%m-%d"),
-            "delivery_date": delivery_date.strftime("%Y-%m-%d"),
+            "bidding_date": _BIDDING_DATE_STR,
+            "delivery_date": _DELIVERY_DATE_STR,
             "cutoff_time_utc": "11:00",
-            "can_place_bids": self.phase == "BIDDING" and now.hour < 11,
+            "can_place_bids": not self._phase_is_trading and self._before_cutoff(),
             "seconds_to_cutoff": max(seconds_to_cutoff, 0),
             "data_initialized": (self._d1_day_ahead_cache is not None and 
-                                (self._d0_day_ahead_cache is not None if self.phase == "TRADING" else True)),
+                                (self._d0_day_ahead_cache is not None if self._phase_is_trading else True)),
             "day_ahead_points": len(self._day_ahead_cache) if self._day_ahead_cache else 0,
             "real_time_points": len(self._real_time_cache) if self._real_time_cache else 0,
             "simulated_time": now.isoformat(),
             "current_simulation_time": f"{now.hour:02d}:{now.minute:02d}:{now.second:02d}",
-            "pending_bids": sum(1 for b in _bids.values() if b["status"] == "PENDING"),
-            "executed_bids": sum(1 for b in _bids.values() if b["status"] == "EXECUTED"),
-            "rejected_bids": sum(1 for b in _bids.values() if b["status"] == "REJECTED"),
-            "trades_count": len(_trades),
+            "pending_bids": len(self._pending_bids),
+            "executed_bids": self._bid_status_counts.get("EXECUTED", 0),
+            "rejected_bids": self._bid_status_counts.get("REJECTED", 0),
+            "trades_count": len(self._trades),
         }
+        self._status_cache = (key, status)
+        return status
 
     def advance_to_trading_day(self) -> Dict:
         """Advance phase to TRADING (D0) and perform batch DAM clearing."""
-        # Switch phase to TRADING (D0 = September 3, 2025)
-        self.phase = "TRADING"
-        
-        # Find the latest hour from ALL bids (including PENDING ones about to be cleared) for better UX
-        bid_hours = []
-        print(f"DEBUG: Checking {len(_bids)} total bids for latest delivery hour")
-        
-        for bid_id, bid in _bids.items():
-            print(f"DEBUG: Bid {bid_id}: hour={bid['hour']}, status={bid['status']}")
-            bid_hours.append(bid["hour"])
-        
-        # Use the maximum hour from all bids, or 10 as fallback if no bids
-        latest_bid_hour = max(bid_hours) if bid_hours else 10
-        print(f"DEBUG: Bid hours found: {bid_hours}, using latest: {latest_bid_hour}")
-        
-        # Set simulated time to the latest bid hour (or 10:00 if none)
-        self._sim_now = datetime(2025, 9, 3, latest_bid_hour, 0, 0, 0, tzinfo=timezone.utc)
-        self._sim_anchor_sim = self._sim_now
-        self._sim_anchor_utc = datetime.now(timezone.utc)
-        print(f"DEBUG: Advanced to D0, set time to {self._sim_now} (latest bid hour: {latest_bid_hour} from {len(_bids)} bids)")
         # D0 data should already be pre-loaded during initialization
-        if self._d0_day_ahead_cache and self._d0_real_time_cache:
-            print(f"DEBUG: Using pre-loaded D0 data: {len(self._d0_day_ahead_cache)} DA, {len(self._d0_real_time_cache)} RT points")
-        else:
-            print(f"DEBUG: WARNING - No D0 data available! Charts will show incorrect data.")
-        # Clear all PENDING bids (this is when DAM clearing happens)
+        if not (self._d0_day_ahead_cache and self._d0_real_time_cache):
+            logger.warning("No D0 data available - charts will show incorrect data")
+        # Clear all PENDING bids in one sweep (this is when DAM clearing happens)
         cleared = 0
         rejected = 0
-        print(f"DEBUG: Starting DAM clearing for {len([b for b in _bids.values() if b['status'] == 'PENDING'])} pending bids")
-        
-        for bid_id, bid in list(_bids.items()):
-            if bid["status"] == "PENDING":
-                print(f"DEBUG: Clearing bid {bid_id}: {bid['side']} {bid['quantity']} MWh @ ${bid['price']} for hour {bid['hour']}")
-                result = self.execute_bid(bid_id, ignore_time=True)
-                if result.get("status") == "executed":
-                    _bids[bid_id]["status"] = "EXECUTED"
-                    cleared += 1
-                    print(f"DEBUG: ✓ EXECUTED - Clearing price: ${result.get('executed_price')}")
-                elif result.get("status") == "rejected":
-                    _bids[bid_id]["status"] = "REJECTED"
-                    rejected += 1
-                    print(f"DEBUG: ✗ REJECTED - Bid: ${bid['price']}, Clearing: ${result.get('clearing_price')}")
-        
-        print(f"DEBUG: DAM clearing complete - {cleared} executed, {rejected} rejected")
+        debug = logger.isEnabledFor(logging.DEBUG)
+        
+        # The phase flip and the clearing share one lock section, so no bid can be
+        # placed after the pending set is read and be left PENDING on D0
+        with self._lock:
+            # Switch phase to TRADING (D0 = September 3, 2025)
+            self.phase = "TRADING"
+            
+            # Latest hour from ALL bids (tracked as bids arrive) for better UX, or 10 as fallback if no bids
+            latest_bid_hour = self._latest_bid_hour if self._latest_bid_hour is not None else 10
+            
+            # Set simulated time to the latest bid hour (or 10:00 if none)
+            self._anchor_sim_clock(datetime(2025, 9, 3, latest_bid_hour, 0, 0, 0, tzinfo=timezone.utc))
+            # One wall-clock read stamps every trade cleared in this batch
+            real_now = datetime.now(timezone.utc)
+            logger.debug("Advanced to D0, set time to %s (latest bid hour: %d)", self._sim_now, latest_bid_hour)
+            clearing_by_hour = self._da_price_lut
+            
+            pending = [self._bids[bid_id] for bid_id in self._pending_bids]
+            if pending:
+                hours = np.fromiter((bid.hour for bid in pending), dtype=np.intp, count=len(pending))
+                prices = np.fromiter((bid.price for bid in pending), dtype=np.float64, count=len(pending))
+                is_buy = np.fromiter((bid.side == "BUY" for bid in pending), dtype=bool, count=len(pending))
+                clearing = clearing_by_hour[hours]
+                # BUY clears at or above the DA price, SELL at or below it; both compares run over
+                # the whole batch and the side picks the result. Bids without a DA price stay PENDING.
+                priced = ~np.isnan(clearing)
+                executed = np.where(is_buy, prices >= clearing, prices <= clearing)
+                
+                for bid, has_price, is_executed, clearing_price in zip(
+                    pending, priced.tolist(), executed.tolist(), clearing.tolist()
+                ):
+                    if not has_price:
+                        continue
+                    bid.clearing_price = clearing_price
+                    if is_executed:
+                        self._record_trade(bid, clearing_price, real_now)
+                        self._set_bid_status(bid, "EXECUTED")
+                        cleared += 1
+                    else:
+                        self._set_bid_status(bid, "REJECTED")
+                        rejected += 1
+                    if debug:
+                        logger.debug(
+                            "Cleared bid %s: %s %s MWh @ $%s for hour %s vs DA $%s -> %s",
+                            bid.id, bid.side, bid.quantity, bid.price, bid.hour, clearing_price, bid.status,
+                        )
+            
+            trades_count = len(self._trades)
+        
+        logger.debug("DAM clearing complete - %d executed, %d rejected", cleared, rejected)
         return {
             "status": "advanced",
-            "phase": self.phase,
+            "phase": "TRADING",
             "cleared": cleared,
             "rejected": rejected,
-            "trades_count": len(_trades),
+            "trades_count": trades_count,
         }
 
     def back_to_bidding_day(self) -> Dict:
         """Go back to BIDDING phase (D-1) to place more orders."""
-        # Switch phase back to BIDDING (D-1 = September 2, 2025)
-        self.phase = "BIDDING"
-        # Set simulated time to 10:00 on September 2, 2025 (D-1) by default
-        self._sim_now = datetime(2025, 9, 2, 10, 0, 0, 0, tzinfo=timezone.utc)
-        self._sim_anchor_sim = self._sim_now
-        self._sim_anchor_utc = datetime.now(timezone.utc)
+        with self._lock:
+            # Switch phase back to BIDDING (D-1 = September 2, 2025)
+            self.phase = "BIDDING"
+            # Set simulated time to 10:00 on September 2, 2025 (D-1) by default
+            self._anchor_sim_clock(datetime(2025, 9, 2, 10, 0, 0, 0, tzinfo=timezone.utc))
         # D-1 data should already be cached from initialization
-        print(f"DEBUG: Back to D-1 - using cached D-1 data")
-        if self._d1_day_ahead_cache and self._d1_real_time_cache:
-            print(f"DEBUG: D-1 data available: {len(self._d1_day_ahead_cache)} DA points, {len(self._d1_real_time_cache)} RT points")
-        else:
-            print(f"DEBUG: WARNING - No D-1 data cached! May need to re-initialize.")
+        if not (self._d1_day_ahead_cache and self._d1_real_time_cache):
+            logger.warning("No D-1 data cached - may need to re-initialize")
         
         return {
             "status": "back_to_bidding",
-            "phase": self.phase,
+            "phase": "BIDDING",
             "message": "Returned to bidding phase (D-1)"
         }
 
     def reset_order_book(self) -> Dict:
         """Clear all bids and trades from the order book."""
-        global _bids, _trades
-        
-        # Store counts for response
-        bid_count = len(_bids)
-        trade_count = len(_trades)
-        
-        # Clear all orders and trades
-        _bids.clear()
-        _trades.clear()
-        
-        print(f"DEBUG: Order book reset - Cleared {bid_count} bids and {trade_count} trades")
+        with self._lock:
+            # Store counts for response
+            bid_count = len(self._bids)
+            trade_count = len(self._trades)
+            
+            # Clear all orders and trades
+            self._bids.clear()
+            self._trades.clear()
+            self._bids_by_user.clear()
+            self._trades_by_user.clear()
+            self._trade_by_bid.clear()
+            self._pending_bids.clear()
+            self._bid_status_counts.clear()
+            self._order_book_version += 1
+            self._pnl_cache.clear()
+            self._latest_bid_hour = None
+            self._bids_per_hour = [0] * 24
+        
+        logger.debug("Order book reset - cleared %d bids and %d trades", bid_count, trade_count)
         
         return {
             "status": "success",
@@ -1,6 +1,8 @@
 """Run the FastAPI application."""
 
+import logging
 import os
+import sys
 import uvicorn
 from app.main import app
 
@@ -9,10 +11,15 @@ if __name__ == "__main__":
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", 8000))
     
+    # Application loggers stay at INFO so the per-bid/per-fetch debug lines are never built
+    logging.basicConfig(level=logging.INFO)
+    
     uvicorn.run(
         "app.main:app",
         host=host,
         port=port,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",  # uvloop has no Windows support
+        http="httptools",
         reload=False,  # Disable reload in production
         log_level="info"
     )
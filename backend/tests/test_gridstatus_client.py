@@ -0,0 +1,37 @@
+"""Tests for the GridStatus DataFrame conversion."""
+
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from app.domain.trading.value_objects import MarketType
+from app.infrastructure.external.gridstatus_client import GridStatusService
+
+
+def test_lmp_conversion_skips_malformed_timestamp():
+    """A bad timestamp string drops only its own row, not the whole frame."""
+    df = pd.DataFrame({
+        "interval_start_utc": ["2025-09-02T00:00:00Z", "not-a-timestamp", "2025-09-02T02:00:00Z"],
+        "lmp": [30.0, 31.0, 32.0],
+    })
+
+    rows = GridStatusService()._convert_lmp_dataframe_to_market_data(df, MarketType.DAY_AHEAD)
+
+    assert [float(row.price.value) for row in rows] == [30.0, 32.0]
+    assert [row.timestamp for row in rows] == [
+        datetime(2025, 9, 2, 0, tzinfo=timezone.utc),
+        datetime(2025, 9, 2, 2, tzinfo=timezone.utc),
+    ]
+
+
+def test_lmp_conversion_sorts_rows_by_timestamp():
+    """Frames without a location column skip hub selection but still come out in time order."""
+    df = pd.DataFrame({
+        "interval_start_utc": ["2025-09-02T02:00:00Z", "2025-09-02T00:00:00Z", "2025-09-02T01:00:00Z"],
+        "lmp": [32.0, 30.0, 31.0],
+    })
+
+    rows = GridStatusService()._convert_lmp_dataframe_to_market_data(df, MarketType.REAL_TIME)
+
+    assert [row.timestamp.hour for row in rows] == [0, 1, 2]
+    assert [float(row.price.value) for row in rows] == [30.0, 31.0, 32.0]
@@ -2,7 +2,7 @@
  * Market Service - Handles all market data API calls
  */
 
-import type { MarketData, MarketSummary, MarketTimeseries } from '../types/market'
+import type { MarketData, MarketSummary, MarketTimeseries, TimeseriesColumns, TimeseriesPoint } from '../types/market'
 
 export class MarketService {
   private static readonly BASE_URL = '/api/market-data'
@@ -151,8 +151,8 @@ export class MarketService {
       const data = await response.json()
       
       return {
-        dayAhead: Array.isArray(data?.day_ahead) ? data.day_ahead : [],
-        realTime: Array.isArray(data?.real_time) ? data.real_time : [],
+        dayAhead: this.toTimeseriesPoints(data?.day_ahead),
+        realTime: this.toTimeseriesPoints(data?.real_time),
         referenceDate: data?.reference_date || '',
         simulationMode: Boolean(data?.simulation_mode),
         currentSimulationTime: data?.current_simulation_time || ''
@@ -163,6 +163,15 @@ export class MarketService {
     }
   }
 
+  /**
+   * Zip a columnar series ({ timestamps, prices }) into chart points
+   */
+  private static toTimeseriesPoints(series?: TimeseriesColumns): TimeseriesPoint[] {
+    const timestamps = series && Array.isArray(series.timestamps) ? series.timestamps : []
+    const prices = series && Array.isArray(series.prices) ? series.prices : []
+    return timestamps.map((timestamp, i) => ({ timestamp, price: Number(prices[i]) || 0 }))
+  }
+
   /**
    * Convert raw market data to MarketData objects
    */
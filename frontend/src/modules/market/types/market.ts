@@ -30,6 +30,11 @@ export interface TimeseriesPoint {
   price: number
 }
 
+export interface TimeseriesColumns {
+  timestamps: string[]
+  prices: number[]
+}
+
 export interface MarketSummary {
   dayAheadPrice: number
   realTimePrice: number